@@ -1,271 +1,302 @@
 """
-Configuration file for system prompts and settings
-Modify these prompts based on your contract types
+Configuration file for application settings
+System prompts live in prompts.py and are loaded on first use
 """
 
 import os
 import logging
-from dotenv import load_dotenv
-
-# Try to import streamlit for secrets management (when deployed to Streamlit Cloud)
-try:
+import functools
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Dict, Final, Optional, Tuple
+
+# Streamlit secrets (Streamlit Cloud) are only consulted when the app itself has
+# imported streamlit; CLI tools and workers never pay for the streamlit import
+@functools.lru_cache(maxsize=None)
+def _detect_secrets() -> dict:
+    """Return Streamlit secrets as a plain dict, or {} when unavailable"""
+    if "streamlit" not in sys.modules:
+        return {}
     import streamlit as st
+    # Cheap existence probe first so st.secrets is only parsed when a file exists
+    try:
+        secrets_files = st.config.get_option("secrets.files")
+    except Exception:
+        secrets_files = [os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml"),
+                         os.path.join(os.getcwd(), ".streamlit", "secrets.toml")]
+    if not any(os.path.exists(path) for path in secrets_files):
+        return {}
     # Check if secrets are available without triggering FileNotFoundError
     try:
-        USE_STREAMLIT_SECRETS = hasattr(st, 'secrets') and len(st.secrets) > 0
+        if hasattr(st, 'secrets') and len(st.secrets) > 0:
+            # Copy once so lookups skip the Streamlit secrets proxy
+            return dict(st.secrets)
     except (FileNotFoundError, RuntimeError):
-        USE_STREAMLIT_SECRETS = False
-except ImportError:
-    USE_STREAMLIT_SECRETS = False
+        pass
+    return {}
 
-# Load from .env file for local development
-if not USE_STREAMLIT_SECRETS:
-    load_dotenv()
+# Keys the app cannot start without
+_REQUIRED_KEYS = ("GROQ_API_KEY",)
 
-# Logging Configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+def _read_dotenv(path: str = ".env") -> dict:
+    """Parse KEY=VALUE lines from a .env file in a single pass"""
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read().decode("utf-8")
+    except OSError:
+        return {}
+    values = {}
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line[0] == "#" or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export "):].strip()
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        else:
+            # Unquoted values may carry an inline comment
+            value = value.split(" #", 1)[0].rstrip()
+        values[key] = value
+    return values
+
+# Parsed .env files keyed by path -> (mtime, values); a reload only re-parses
+# the file when it has changed on disk
+_DOTENV_CACHE: Dict[str, Tuple[float, dict]] = {}
+
+def _cached_dotenv(path: str = ".env") -> dict:
+    """Return parsed .env values, re-reading the file only when its mtime changes"""
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return {}
+    cached = _DOTENV_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    values = _read_dotenv(path)
+    _DOTENV_CACHE[path] = (mtime, values)
+    return values
+
+# Snapshot .env (local development) merged under the process environment once,
+# so config lookups are plain dict reads instead of repeated getenv calls
+@functools.lru_cache(maxsize=None)
+def _load_env() -> dict:
+    """Return the process environment merged over .env values"""
+    # Skip the .env scan when secrets come from Streamlit or when production
+    # deployments opt out with AGENTIC_RAG_NO_DOTENV=1; exported keys still
+    # override .env values key by key
+    if _detect_secrets() or os.environ.get("AGENTIC_RAG_NO_DOTENV") == "1":
+        return dict(os.environ)
+    # Explicit path: no parent-directory walk looking for .env
+    cfg = dict(_cached_dotenv(os.environ.get("DOTENV_PATH", ".env")))
+    cfg.update(os.environ)
+    return cfg
+
+USE_STREAMLIT_SECRETS = bool(_detect_secrets())
+
+# Logging Configuration - handlers are installed by the app entry point via
+# configure_logging(), never on import
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Configure root logging once for the application (no-op if already configured)"""
+    # Records never use thread/process fields, so skip collecting them
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    # Timestamps cost a localtime() per record; most hosts (journald, Streamlit
+    # Cloud, CloudWatch) prepend their own, so they are opt-in
+    if get_config("LOG_TIMESTAMPS") == "1":
+        log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    else:
+        log_format = '%(levelname)s %(name)s %(message)s'
+    logging.basicConfig(level=level, format=log_format)
 
 # Helper function to get config value (from Streamlit secrets or .env)
+# Cached so repeated lookups during a Streamlit rerun are plain dict hits;
+# call _load_env.cache_clear() and get_config.cache_clear() to pick up edited values.
+@functools.lru_cache(maxsize=None)
 def get_config(key: str, default: str = None) -> str:
     """Get configuration value from Streamlit secrets or environment variables"""
-    if USE_STREAMLIT_SECRETS:
-        try:
-            return st.secrets.get(key, default)
-        except Exception:
-            pass
-    return os.getenv(key, default)
+    secrets = _detect_secrets()
+    if secrets:
+        return secrets.get(key, default)
+    return _load_env().get(key, default)
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed application settings, parsed once from Streamlit secrets / environment"""
+    groq_api_key: Optional[str] = field(default=None, repr=False)
+    # Available Groq models: openai/gpt-oss-120b, openai/gpt-oss-28b, llama-3.1-8b-instant, llama-3.3-70b-versatile
+    groq_model: str = "openai/gpt-oss-120b"
+    groq_temperature: float = 0.1
+    groq_max_tokens: int = 2048
+    supervisor_llm_routing: bool = False  # Ask the LLM to route queries no keyword matches
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_device: str = "cpu"  # Change to "cuda" if GPU available
+    embedding_batch_size: int = 64  # Chunks per forward pass when embedding uploads
+    embedding_backend: str = "huggingface"  # Options: huggingface, onnx-int8 (CPU, needs optimum)
+    embedding_dtype: str = "auto"  # Options: auto (float16 on CUDA, else float32), float32, float16, bfloat16
+    embedding_compile: bool = False  # torch.compile the encoder (slow first start, faster encodes)
+    chunk_size: int = 250  # Tokens per chunk; fits the MiniLM 256-token window
+    chunk_overlap: int = 50  # Overlapping tokens for context preservation
+    max_file_size_mb: int = 50
+    vector_store_type: str = "chromadb"  # Options: chromadb, faiss
+    chroma_persist_dir: str = "./chroma_db"
+    top_k_results: int = 12  # Increased to 12 for better coverage of varied question types
+    # HNSW index knobs: higher M / ef raise recall at the cost of memory and latency
+    hnsw_m: int = 24
+    hnsw_construction_ef: int = 128
+    hnsw_search_ef: int = 100  # Must be >= RERANK_CANDIDATE_FACTOR * TOP_K_RESULTS
+    flat_index_max_chunks: int = 5000  # Exact in-memory search up to this many chunks (0 = always HNSW)
+    semantic_cache_threshold: float = 0.97  # Cosine similarity for reusing a cached retrieval
+    semantic_cache_size: int = 128  # Cached queries per session (0 disables the cache)
+
+    @functools.cached_property
+    def log_line(self) -> str:
+        """One-line settings summary for logging, built once (never includes the API key)"""
+        return (f"Settings(model={self.groq_model}, chunks={self.chunk_size}/{self.chunk_overlap}, "
+                f"top_k={self.top_k_results}, store={self.vector_store_type})")
+
+# Numeric settings: (key, type, (min, max)); defaults come from Settings
+_NUMERIC_SPEC = (
+    ("GROQ_TEMPERATURE", float, (0.0, 2.0)),
+    ("GROQ_MAX_TOKENS", int, (1, 131_072)),
+    ("EMBEDDING_BATCH_SIZE", int, (1, 4_096)),
+    ("CHUNK_SIZE", int, (1, 100_000)),
+    ("CHUNK_OVERLAP", int, (0, 100_000)),
+    ("MAX_FILE_SIZE_MB", int, (1, 10_000)),
+    ("TOP_K_RESULTS", int, (1, 1_000)),
+    ("HNSW_M", int, (2, 512)),
+    ("HNSW_CONSTRUCTION_EF", int, (1, 10_000)),
+    ("HNSW_SEARCH_EF", int, (1, 10_000)),
+    ("FLAT_INDEX_MAX_CHUNKS", int, (0, 1_000_000)),
+    ("SEMANTIC_CACHE_THRESHOLD", float, (0.0, 1.0)),
+    ("SEMANTIC_CACHE_SIZE", int, (0, 100_000)),
+)
 
+# On/off settings; "1", "true", "yes" and "on" (any case) enable them
+_FLAG_KEYS = ("SUPERVISOR_LLM_ROUTING", "EMBEDDING_COMPILE")
+
+def _parse_env() -> dict:
+    """Read and type-cast every setting in a single pass, reporting all bad values at once"""
+    values = {}
+    for f in fields(Settings):
+        raw = get_config(f.name.upper())
+        if raw is not None:
+            values[f.name] = raw
+
+    errors = []
+    for key, caster, (low, high) in _NUMERIC_SPEC:
+        name = key.lower()
+        if name not in values:
+            continue
+        raw = values[name]
+        try:
+            value = caster(raw)
+        except (TypeError, ValueError):
+            errors.append(f"{key}={raw!r} (expected {caster.__name__})")
+            continue
+        if not low <= value <= high:
+            errors.append(f"{key}={raw!r} (expected {low}..{high})")
+            continue
+        values[name] = value
+    for key in _FLAG_KEYS:
+        name = key.lower()
+        if name in values:
+            values[name] = str(values[name]).strip().lower() in ("1", "true", "yes", "on")
+    if errors:
+        raise ValueError(f"Invalid configuration values: {', '.join(errors)}")
+    return values
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the process-wide Settings instance on first call"""
+    return Settings(**_parse_env())
+
+SETTINGS = get_settings()
+
+# Module-level names kept for existing imports (new code should use SETTINGS)
 # API Configuration
-GROQ_API_KEY = get_config("GROQ_API_KEY")
-# Available Groq models: openai/gpt-oss-120b, openai/gpt-oss-28b, llama-3.1-8b-instant, llama-3.3-70b-versatile
-GROQ_MODEL = get_config("GROQ_MODEL", "openai/gpt-oss-120b")
-GROQ_TEMPERATURE = float(get_config("GROQ_TEMPERATURE", "0.1"))
-GROQ_MAX_TOKENS = int(get_config("GROQ_MAX_TOKENS", "2048"))
+GROQ_API_KEY: Final[Optional[str]] = SETTINGS.groq_api_key
+GROQ_MODEL: Final[str] = sys.intern(SETTINGS.groq_model)
+GROQ_TEMPERATURE: Final[float] = SETTINGS.groq_temperature
+GROQ_MAX_TOKENS: Final[int] = SETTINGS.groq_max_tokens
+SUPERVISOR_LLM_ROUTING: Final[bool] = SETTINGS.supervisor_llm_routing
 
 # Embedding Configuration
-EMBEDDING_MODEL = get_config("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-EMBEDDING_DEVICE = get_config("EMBEDDING_DEVICE", "cpu")  # Change to "cuda" if GPU available
-
-# System Prompts - MODIFY THESE BASED ON YOUR CONTRACTS
-RETRIEVER_PROMPT = """
-You are a specialized logistics and transportation contract retrieval expert. Your role is to:
-1. Search for specific transportation terms: FTL/LTL rates, fuel surcharge, KPIs, OTD, transit times, equipment types, ADR, reefer
-2. Focus on retrieving EXACT clauses about: pricing structure, payment terms, penalties, operational requirements, safety
-3. Identify customer-specific rules (Tesla, Barry Callebaut, Prysmian, Carlsberg, etc.)
-4. **Prioritize critical business rules**: Exclusions (NOT allowed, prohibited, excluded), mandatory requirements, termination clauses
-5. Be selective - retrieve only 2-3 most relevant passages with contract reference
-
-**Key Terms to Prioritize:**
-
-**Contract Details:**
-- Customer name, sector, products offered
-- Tender deadline, number of rounds, expected go-live date
-- Contract period, price validity duration
-
-**Service & Equipment:**
-- Service type: FTL/LTL road, intermodal, short-sea, rail
-- Equipment: Thermo/Ambient/Reefer trailers, temperature ratings (°C range)
-- ADR (Dangerous Goods): ADR conditions, ADR classes (1-9), hazmat requirements
-- Special requirements: Double driver, safety equipment, CMR insurance
-
-**Pricing & Charges:**
-- Base rates: FTL/LTL (€/km or €/shipment)
-- FSC (Fuel Surcharge): %, base fuel rate (€/liter), fuel effect ratio
-- Additional charges: Waiting time, demurrage, multi-stop fees, drop charges
-- Special costs: Free time, weekend loading/unloading charges
-
-**KPIs & Penalties:**
-- OTD (On-Time Delivery %), booking acceptance %, claims rate %, POD upload %
-- Penalties: Late delivery fees, booking rejection charges, KPI failure consequences, chargeback %
-- Demurrage fees for exceeding free time
-
-**Operations:**
-- Pre-advise: Vehicle request timing, fulfillment time requirements
-- Transit time standards (hours/days)
-- Loading/unloading windows, booking lead time
-- Temperature control requirements and ratings
-
-**Payment & Compliance:**
-- Payment terms: Net days, invoice requirements, deduction clauses
-- Compliance: CMR documents, POD (Proof of Delivery), export documents, SHP numbers
-- Sustainability: CO2 tracking, alternative fuels, environmental certifications
-
-When responding:
-- Keep retrieved text minimal and focused on exact figures and terms
-- Quote specific rates, percentages, timeframes, KPI targets, temperature ranges
-- Include contract section numbers or clause references when available
-- Prioritize numerical data and concrete requirements over general descriptions
-"""
-
-ANALYST_PROMPT = """
-You are a logistics contract analyst specializing in FTL/LTL transportation agreements. Answer questions DIRECTLY and CONCISELY using the retrieved contract information.
-
-CRITICAL RULES:
-1. **Answer the question directly** - Give the specific information requested without unnecessary prefixes
-2. **Be concise** - For simple questions (customer name, deadline, payment term), give brief answers
-3. **Include exact numbers**: Rates (€/km, €/shipment), percentages (fuel %, KPI targets), timeframes (hours, days), temperature ranges (°C)
-4. **Use bullet points** for complex answers with multiple items
-5. **Answer ONLY what was asked** - no extra analysis unless requested
-6. **NEVER create tables** - Use bullet points instead. Tables break formatting and become unreadable
-7. **NEVER ask user to paste contract content** - Work ONLY with the retrieved information. If info is missing, say "Not specified in the contract" and move on
-8. **CRITICAL - Customer filtering**: Each retrieved chunk has [Customer: X] metadata. When answering questions, ONLY use information from the SAME customer. If you see chunks from multiple customers (e.g., Tesla AND Barry Callebaut), identify which customer is being asked about from Q1 answer, then IGNORE all chunks from other customers. DO NOT mix Tesla KPIs into Barry contracts or vice versa!
-9. **Highlight critical business rules** - When contract contains exclusions, prohibitions, or mandatory requirements, emphasize them:
-   - Exclusions/Prohibitions: Start with "**NOT ALLOWED:**" or "**EXCLUDED:**" (e.g., "**NOT ALLOWED:** Rail transport")
-   - Mandatory requirements: Start with "**REQUIRED:**" or "**MANDATORY:**"
-   - Severe penalties: Start with "**PENALTY:**" or "**WARNING:**"
-   - Contract termination clauses: Start with "**TERMINATION RISK:**"
-
-**Answer Format Examples:**
-
-**Simple Questions (give brief answers):**
-- Q: "What is customers name?" → A: "Tesla Motors Netherlands B.V." or "Tesla"
-  **CRITICAL**: The customer is the COMPANY mentioned in the contract header (e.g., "Tesla Motors", "Barry Callebaut AG", "Prysmian Group").
-  **NOT SERVICE TYPES** like "Replenishment", "FTL", "LTL", "Rates Agreement" - these are contract types, not customer names!
-  Look for company legal names (B.V., AG, GmbH, Ltd., Inc., etc.) or brand names.
-- Q: "What is the customers sector?" → A: "Automotive - electric vehicle manufacturing"
-- Q: "What is the payment term?" → A: "Net 30 days from invoice date"
-- Q: "When is the deadline?" → A: "December 15, 2024"
-
-**Complex Questions (use structured format):**
-
-**Service & Equipment:**
-- **Service type**: "Service: FTL road / Intermodal rail-road / Short-sea ferry / Rail only. Explain mode combinations if applicable"
-- **Equipment**: "Thermo trailers (Nov-Mar, -20°C to +20°C), Ambient trailers (Apr-Oct), Reefer (+2°C to +8°C for fresh produce)"
-- **ADR**: "ADR required: Yes/No. Classes: [1-9 if specified]. Types: [Explosive/Flammable/Toxic/etc]. Special requirements: [Details]"
-- **Special requirements**: "Double driver: [Yes/No, conditions]. Safety equipment: [List items]. CMR insurance: [Coverage details]"
-
-**Pricing & Charges:**
-- **Rates**: "Base rate: €X/km + FSC: X% (base fuel: €Y/liter, effect ratio: Z) + Waiting: €A/hour after Bh free"
-- **Free time & weekend**: "Free time: X hours loading + Y hours unloading. Weekend loading: €Z extra per shift"
-
-**KPIs & Penalties:**
-- **KPIs**: "OTD target: X%, Minimum: Y%. Claims: <Z%. Booking acceptance: X%. POD upload: X% within 48h"
-- **Penalties**: "€X per failed delivery OR Y% chargeback. Demurrage: €Z/hour after free time. Sustained failure: Lane reassignment/contract termination"
-
-**Operations:**
-- **Pre-advise**: "Customer requests vehicle [X hours/days] in advance. Fulfillment required within [Y hours]. Booking lead time: [Z days]"
-- **Transit times**: "Standard: X hours. Express: Y hours. Temperature controlled: Add Z hours for pre-cooling"
-
-**Payment & Compliance:**
-- **Payment**: "Net X days from invoice date. Deductions: Y% for non-compliance"
-
-**Examples:**
-
-Q: "What is the OTD requirement for Tesla?"
-Good: "Tesla requires 98% OTD. Minimum acceptable is 95%. Penalty: 7% chargeback for failed deliveries, and lane reassignment after 3 consecutive months below 95%."
-Bad: [Long table with all KPI clauses]
-
-Q: "If contract mentions ADR, summarize its type"
-Good: "ADR required: Yes. Classes: 3 (Flammable liquids) and 8 (Corrosive substances). Special requirements: UN certified packaging, ADR-trained drivers, hazmat placards on vehicle."
-Bad: "The contract has ADR requirements."
-
-Q: "What is the service type? Explain."
-Good: "Service type: Intermodal rail-road. This means freight travels by rail for long-haul (e.g., Germany to Italy) and switches to FTL truck for first/last mile to customer locations. Reduces costs and CO2 vs. full road transport."
-Bad: "Intermodal service."
-
-**If service type is NOT specified in contract:**
-Good: "The contract does not specify a particular service type. Based on the scope, it appears to be FTL road service."
-Bad: [Creating tables or generic explanations of all service types]
-
-Q: "If contract mentions reefer, what are the ratings?"
-Good: "Reefer required: Yes. Temperature range: +2°C to +8°C for fresh food products. Multi-temperature capability: -18°C frozen + +4°C chilled in same trailer. Pre-cooling: 2 hours before loading."
-Bad: "Reefer trailers needed."
-
-Q: "What is the service type?"
-Good (with exclusion): "Service type: FTL road transport only. **NOT ALLOWED:** Rail transport is explicitly excluded from this contract."
-Bad: "FTL road transport."
-
-Q: "Summarise KPI conditions and penalties"
-Good (with penalty emphasis): "KPIs: OTD ≥98%, Claims <0.2%, POD upload ≥95% within 48h. **PENALTY:** €350/day demurrage after 24h free time. **TERMINATION RISK:** Sustained KPI failure below 95% for 3 consecutive months triggers lane reassignment or contract termination."
-Bad: "OTD is 98% and there are some penalties for non-compliance."
-
-Be direct, precise with numbers, and answer ONLY what the user asked.
-"""
-
-SUPERVISOR_PROMPT = """
-You are a supervisor managing logistics and transportation contract analysis. You coordinate between:
-- A retriever agent: for finding relevant contract sections (rates, KPIs, penalties, operational terms)
-- An analyst agent: for interpreting FTL/LTL contract terms and providing specific answers
-- A summarizer agent: for creating concise summaries of transportation agreements
-
-Your responsibilities:
-1. **Identify query type**: Rate inquiry, KPI requirement, penalty clause, operational rule, payment terms, or general summary
-2. **Delegate to retriever first**: Always retrieve relevant contract sections before analysis
-3. **Route to appropriate agent**:
-   - For specific questions (rates, KPIs, penalties) → Analyst
-   - For contract overviews or summaries → Summarizer
-4. **Customer context**: Identify which customer contract is being queried (Tesla, Barry Callebaut, Prysmian, Carlsberg, etc.)
-5. **Compile precise answers**: Ensure responses include exact figures, percentages, and timeframes
-
-**Common Query Patterns:**
-- "What is the [rate/KPI/penalty] for [customer]?" → Retriever → Analyst
-- "Summarize the [customer] contract" → Retriever → Summarizer
-- "What happens if [KPI/condition] is not met?" → Retriever → Analyst (focus on penalties)
-- "What are the payment terms?" → Retriever → Analyst
-- "Compare [aspect] between customers" → Multiple retrievals → Analyst
-
-Always work sequentially: retrieve first, then analyze or summarize. Never skip retrieval step.
-"""
-
-SUMMARIZER_PROMPT = """
-You are a logistics and transportation contract summarization expert. Your role is to:
-1. Create clear, concise summaries of FTL/LTL transportation agreements
-2. Highlight key operational terms, rates, KPIs, and compliance requirements
-3. Focus on actionable information for logistics operations teams
-4. Maintain factual accuracy with specific numbers and percentages
-
-**Summary Structure (in order):**
-1. **Contract Overview**: Customer name, contract period, scope (lanes/routes), volume estimates
-2. **Pricing Structure**:
-   - Base FTL/LTL rates (€/km or €/shipment)
-   - Fuel surcharge (%, baseline price)
-   - Additional charges (waiting time, multi-stop, demurrage)
-   - Seasonal adjustments if any
-3. **KPI Requirements**:
-   - OTD (On-Time Delivery) target % and minimum %
-   - Claims rate maximum %
-   - Booking acceptance target %
-   - POD upload compliance (% within timeframe)
-4. **Operational Requirements**:
-   - Transit time standards
-   - Equipment type (thermo/ambient trailers)
-   - Loading/unloading procedures
-   - Booking lead time
-5. **Penalties & Consequences**:
-   - Late delivery fees (€ or % chargeback)
-   - KPI failure penalties
-   - Contract termination conditions
-6. **Payment Terms**: Net payment days, invoice requirements
-7. **Compliance & Sustainability**: CMR, POD, CO2 tracking, certifications
-
-**Format Guidelines:**
-- Use bullet points for easy scanning
-- Include ALL numerical values (rates, %, days, hours)
-- Keep under 500 words unless specified otherwise
-- Highlight critical penalties and KPI thresholds
-- Note any customer-specific or unusual clauses
-
-Example opening: "FTL Transportation Agreement with Tesla for 2025 replenishment operations. Contract covers inbound/outbound/delta lanes at 2-digit ZIP level. Estimated 10,000+ annual shipments."
-"""
+EMBEDDING_MODEL: Final[str] = sys.intern(SETTINGS.embedding_model)
+EMBEDDING_DEVICE: Final[str] = sys.intern(SETTINGS.embedding_device)
+EMBEDDING_BATCH_SIZE: Final[int] = SETTINGS.embedding_batch_size
+EMBEDDING_BACKEND: Final[str] = sys.intern(SETTINGS.embedding_backend)
+EMBEDDING_DTYPE: Final[str] = sys.intern(SETTINGS.embedding_dtype)
+EMBEDDING_COMPILE: Final[bool] = SETTINGS.embedding_compile
 
 # Document Processing Configuration
-CHUNK_SIZE = int(get_config("CHUNK_SIZE", "1000"))  # Balanced size for contract content
-CHUNK_OVERLAP = int(get_config("CHUNK_OVERLAP", "200"))  # Overlap for context preservation
-MAX_FILE_SIZE_MB = int(get_config("MAX_FILE_SIZE_MB", "50"))
+CHUNK_SIZE: Final[int] = SETTINGS.chunk_size
+CHUNK_OVERLAP: Final[int] = SETTINGS.chunk_overlap
+MAX_FILE_SIZE_MB: Final[int] = SETTINGS.max_file_size_mb
 
 # Vector Store Configuration
-VECTOR_STORE_TYPE = get_config("VECTOR_STORE_TYPE", "chromadb")  # Options: chromadb, faiss
-CHROMA_PERSIST_DIR = get_config("CHROMA_PERSIST_DIR", "./chroma_db")
-TOP_K_RESULTS = int(get_config("TOP_K_RESULTS", "12"))  # Increased to 12 for better coverage of varied question types
+VECTOR_STORE_TYPE: Final[str] = sys.intern(SETTINGS.vector_store_type)
+CHROMA_PERSIST_DIR: Final[str] = sys.intern(SETTINGS.chroma_persist_dir)
+TOP_K_RESULTS: Final[int] = SETTINGS.top_k_results
+HNSW_M: Final[int] = SETTINGS.hnsw_m
+HNSW_CONSTRUCTION_EF: Final[int] = SETTINGS.hnsw_construction_ef
+HNSW_SEARCH_EF: Final[int] = SETTINGS.hnsw_search_ef
+FLAT_INDEX_MAX_CHUNKS: Final[int] = SETTINGS.flat_index_max_chunks
+SEMANTIC_CACHE_THRESHOLD: Final[float] = SETTINGS.semantic_cache_threshold
+SEMANTIC_CACHE_SIZE: Final[int] = SETTINGS.semantic_cache_size
+
+# HNSW candidates fetched per requested result before exact-cosine reranking
+RERANK_CANDIDATE_FACTOR: Final[int] = 4
+
+# Cross-setting checks run by validate_config: (key, predicate, problem)
+_SETTING_CHECKS = (
+    ("CHUNK_OVERLAP", lambda s: s.chunk_overlap < s.chunk_size, "must be smaller than CHUNK_SIZE"),
+    ("HNSW_SEARCH_EF", lambda s: s.hnsw_search_ef >= RERANK_CANDIDATE_FACTOR * s.top_k_results,
+     f"must be at least {RERANK_CANDIDATE_FACTOR} x TOP_K_RESULTS (reranking fetches that many candidates)"),
+    ("EMBEDDING_BACKEND", lambda s: s.embedding_backend in ("huggingface", "onnx-int8"),
+     "must be one of: huggingface, onnx-int8"),
+    ("EMBEDDING_DTYPE", lambda s: s.embedding_dtype in ("auto", "float32", "float16", "bfloat16"),
+     "must be one of: auto, float32, float16, bfloat16"),
+)
 
-# Validate configuration
+# Validate configuration (once per process; failures are not cached and re-raise)
+@functools.cache
 def validate_config():
-    """Validate required configuration is present"""
-    if not GROQ_API_KEY:
-        raise ValueError("GROQ_API_KEY not found in environment variables")
-    logger.info(f"Configuration loaded successfully - Model: {GROQ_MODEL}")
-    return True
\ No newline at end of file
+    """Validate required configuration is present, reporting every problem at once"""
+    problems = [f"{key} not found in environment variables"
+                for key in _REQUIRED_KEYS if not getattr(SETTINGS, key.lower())]
+    problems += [f"{key} {problem}"
+                 for key, check, problem in _SETTING_CHECKS if not check(SETTINGS)]
+    if problems:
+        raise ValueError("; ".join(problems))
+    logger.info("Configuration loaded successfully - %s", SETTINGS.log_line)
+    return True
+
+# Prompts are loaded lazily so processes that never build an agent skip them
+_PROMPT_NAMES = ("RETRIEVER_PROMPT", "ANALYST_PROMPT", "SUPERVISOR_PROMPT", "SUMMARIZER_PROMPT")
+
+def __getattr__(name: str):
+    """Resolve prompt constants (e.g. config.ANALYST_PROMPT) from prompts.py on first access"""
+    if name in _PROMPT_NAMES:
+        import prompts
+        return getattr(prompts, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = (
+    "Settings", "SETTINGS", "get_settings", "get_config", "validate_config", "configure_logging",
+    "USE_STREAMLIT_SECRETS",
+    "GROQ_API_KEY", "GROQ_MODEL", "GROQ_TEMPERATURE", "GROQ_MAX_TOKENS", "SUPERVISOR_LLM_ROUTING",
+    "EMBEDDING_MODEL", "EMBEDDING_DEVICE", "EMBEDDING_BATCH_SIZE", "EMBEDDING_BACKEND",
+    "EMBEDDING_DTYPE", "EMBEDDING_COMPILE",
+    "CHUNK_SIZE", "CHUNK_OVERLAP", "MAX_FILE_SIZE_MB",
+    "VECTOR_STORE_TYPE", "CHROMA_PERSIST_DIR", "TOP_K_RESULTS",
+    "HNSW_M", "HNSW_CONSTRUCTION_EF", "HNSW_SEARCH_EF", "RERANK_CANDIDATE_FACTOR", "FLAT_INDEX_MAX_CHUNKS",
+    "SEMANTIC_CACHE_THRESHOLD", "SEMANTIC_CACHE_SIZE",
+)
@@ -0,0 +1,149 @@
+"""
+Embedding backends used by the RAG system
+SentenceTransformer (default) and int8-quantized ONNX Runtime for CPU
+(EMBEDDING_BACKEND=onnx-int8, requires optimum[onnxruntime])
+"""
+
+import os
+import logging
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Quantized exports are written once per model and reused on later starts
+_ONNX_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "agentic_rag", "onnx")
+_OPTIMIZED_FILE = "model_optimized.onnx"
+_QUANTIZED_FILE = "model_optimized_quantized.onnx"
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """SentenceTransformer called directly, with reduced-precision weights (FP16 by default on CUDA)"""
+
+    def __init__(self, model_name: str, device: str = "cpu", batch_size: int = 64,
+                 normalize: bool = True, compile_model: bool = False, dtype: str = "auto"):
+        from sentence_transformers import SentenceTransformer
+
+        self.client = SentenceTransformer(model_name, device=device)
+        if dtype == "auto":
+            # MiniLM-class encoders are fp16-safe; halves memory traffic on GPU
+            dtype = "float16" if device.startswith("cuda") else "float32"
+        if dtype != "float32":
+            import torch
+            self.client = self.client.to(getattr(torch, dtype))
+        self.batch_size = batch_size
+        self.normalize = normalize
+        if compile_model:
+            self._compile()
+
+    @property
+    def max_seq_length(self) -> int:
+        """Longest input, in tokens including special tokens, that the encoder embeds without truncation"""
+        return self.client.get_max_seq_length()
+
+    def _compile(self) -> None:
+        """torch.compile the transformer and pay the compile cost now, not on the first query"""
+        import torch
+
+        module = self.client._first_module()
+        # dynamic=True: sequence lengths vary per batch, avoid a recompile per shape
+        module.auto_model = torch.compile(module.auto_model, mode="reduce-overhead", dynamic=True)
+        logger.info("Compiling embedding model (one-time warm-up)")
+        self.embed_query("warmup")
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in one call (SentenceTransformer batches internally)"""
+        vectors = self.client.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            convert_to_tensor=False,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=False,
+        )
+        return vectors.astype(np.float32, copy=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents"""
+        if not texts:
+            return []
+        return self._encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self._encode([text])[0].tolist()
+
+
+def _quantized_model_dir(model_name: str) -> str:
+    """Directory holding the int8 export for a model"""
+    return os.path.join(_ONNX_CACHE_DIR, model_name.replace("/", "__"))
+
+
+class OptimumEmbeddings(Embeddings):
+    """Sentence embeddings from a graph-optimized, int8-quantized ONNX model (mean pooling + L2 norm)"""
+
+    def __init__(self, model_name: str, batch_size: int = 64, normalize: bool = True):
+        # Optional dependency: only imported when this backend is selected
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTOptimizer, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+        from transformers import AutoTokenizer
+
+        save_dir = _quantized_model_dir(model_name)
+        if not os.path.exists(os.path.join(save_dir, _QUANTIZED_FILE)):
+            logger.info(f"Exporting, optimizing and quantizing {model_name} to {save_dir}")
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name, export=True, provider="CPUExecutionProvider"
+            )
+            # O3: all graph fusions (attention, layer norm, GELU) before quantizing
+            ORTOptimizer.from_pretrained(model).optimize(
+                save_dir=save_dir, optimization_config=OptimizationConfig(optimization_level=99)
+            )
+            quantizer = ORTQuantizer.from_pretrained(save_dir, file_name=_OPTIMIZED_FILE)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=True)
+            quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(save_dir)
+
+        self._model = ORTModelForFeatureExtraction.from_pretrained(
+            save_dir, file_name=_QUANTIZED_FILE, provider="CPUExecutionProvider"
+        )
+        self._tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        self.batch_size = batch_size
+        self.normalize = normalize
+
+    @property
+    def max_seq_length(self) -> int:
+        """Longest input, in tokens including special tokens, before the tokenizer truncates"""
+        return self._tokenizer.model_max_length
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode one batch of texts into pooled sentence vectors"""
+        inputs = self._tokenizer(texts, padding=True, truncation=True, return_tensors="np")
+        hidden = np.asarray(self._model(**inputs).last_hidden_state)
+        # Mean pooling over real (non-padding) tokens
+        mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents in length-sorted batches of batch_size"""
+        if not texts:
+            return []
+        # Similar lengths share a batch, so little compute is spent on padding
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        vectors = np.empty((len(texts), 0), dtype=np.float32)
+        for i in range(0, len(texts), self.batch_size):
+            batch = order[i:i + self.batch_size]
+            pooled = self._encode([texts[j] for j in batch])
+            if vectors.shape[1] == 0:
+                vectors = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            # Write each vector back to its input position
+            vectors[batch] = pooled
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self._encode([text])[0].tolist()
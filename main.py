@@ -3,69 +3,260 @@ Main RAG Contract Analysis Application
 """
 
 import streamlit as st
-from typing import List, Dict, Any, Annotated, TypedDict, Sequence, Literal
+from typing import TYPE_CHECKING, List, Dict, Any, Annotated, TypedDict, Sequence, Literal, Optional, Tuple, Union, IO, Iterator
+import asyncio
+import hashlib
+import io
 import os
-import tempfile
+import functools
 from datetime import datetime
 import json
 import logging
 import re
-import pandas as pd
+import threading
+import time
+import uuid
 from langchain_core.documents import Document
 
-# LangChain imports
-from langchain_groq import ChatGroq
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain_community.vectorstores import Chroma
+# LangChain core imports (lightweight). Heavy dependencies - the Groq client,
+# Chroma, LangGraph, embedding models, pandas and the PDF parsers - are imported
+# where they are first used so the Streamlit UI renders before they load.
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, ToolMessage, SystemMessage
-from langchain_huggingface import HuggingFaceEmbeddings
-
-# LangGraph imports - Updated for new API
-from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.embeddings import Embeddings
 
 # Import configuration
-from config import *
+from config import SETTINGS, RERANK_CANDIDATE_FACTOR, validate_config, configure_logging
+from prompts import RETRIEVER_PROMPT, ANALYST_PROMPT, SUPERVISOR_PROMPT, SUMMARIZER_PROMPT
+from prompts import RETRIEVER_PROMPT_HASH, ANALYST_PROMPT_HASH, SUPERVISOR_PROMPT_HASH, SUMMARIZER_PROMPT_HASH
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# HNSW index settings for the contracts collection. Embeddings are unit-normalized,
+# so cosine is the matching metric; M (graph degree) and the ef values trade
+# memory/latency for recall (see HNSW_* in config.py)
+_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": SETTINGS.hnsw_m,
+    "hnsw:construction_ef": SETTINGS.hnsw_construction_ef,
+    "hnsw:search_ef": SETTINGS.hnsw_search_ef,
+}
+
+# Static system messages, built once and sent unchanged as the first message of
+# every call so the provider can reuse the cached prompt prefix
+_ROUTING_INSTRUCTIONS = """Based on the query, decide which agent should handle this:
+- "retriever" - for finding information in contracts
+- "analyst" - for analyzing contract terms
+- "summarizer" - for summarizing contracts
+- "end" - if the query has been fully answered
+
+Respond with ONLY the agent name (retriever/analyst/summarizer/end)."""
+_SUPERVISOR_SYSTEM = SystemMessage(content=f"{SUPERVISOR_PROMPT}\n\n{_ROUTING_INSTRUCTIONS}")
+_ANALYST_SYSTEM = SystemMessage(content=ANALYST_PROMPT)
+_SUMMARIZER_SYSTEM = SystemMessage(content=SUMMARIZER_PROMPT)
+
+# Graph nodes whose LLM output is the user-facing answer (streamed to the chat)
+_ANSWER_NODES = ("retrieve_and_answer", "summarizer")
+
 # Define the state for our graph
 class AgentState(TypedDict):
     """State for the multi-agent system"""
     messages: Sequence[BaseMessage]
     next: str
 
+# Known customers, matched as substrings of the upper-cased filename
+_CUSTOMERS = ('TESLA', 'BARRY', 'PRYSMIAN', 'CARLSBERG', 'CALLEBAUT')
+# Single-pass matcher over all known customers
+_CUSTOMER_RE = re.compile("|".join(map(re.escape, _CUSTOMERS)))
+# Separators between filename words
+_FILENAME_SPLIT_RE = re.compile(r'[_\-\s]+')
+# Service types and common words that are never a customer name
+_SKIP_WORDS = frozenset({
+    'FTL', 'LTL', 'TERMS', 'CONDITIONS', 'REPLENISHMENT', 'RATES', 'AGREEMENT', 'RFQ',
+    'SOP', 'QUOTATION', 'OUTBOUND', 'INBOUND', 'EMEA', 'GLOBAL'
+})
+
 def extract_customer_name(filename: str) -> str:
     """Extract customer name from filename"""
     # Remove file extension
-    name = os.path.splitext(filename)[0]
-
-    # Common customer names to look for
-    customers = ['TESLA', 'BARRY', 'PRYSMIAN', 'CARLSBERG', 'CALLEBAUT']
+    name_upper = os.path.splitext(filename)[0].upper()
 
     # Check if any customer name is in the filename (case insensitive)
-    filename_upper = name.upper()
-    for customer in customers:
-        if customer in filename_upper:
-            return customer.title()
-
-    # If no known customer found, try to extract from path or filename
-    # Pattern: Look for capital words or words after common separators
-    parts = re.split(r'[_\-\s]+', name)
-    if parts:
-        # Return first meaningful part (skip dates and common words)
-        # Skip service types like REPLENISHMENT, RATES, RFQ, SOP, etc.
-        skip_words = ['FTL', 'LTL', 'TERMS', 'CONDITIONS', 'REPLENISHMENT', 'RATES', 'AGREEMENT', 'RFQ', 'SOP', 'QUOTATION', 'OUTBOUND', 'INBOUND', 'EMEA', 'GLOBAL']
-        for part in parts:
-            if len(part) > 3 and not part.isdigit() and part.upper() not in skip_words:
-                return part.title()
+    match = _CUSTOMER_RE.search(name_upper)
+    if match:
+        return match.group(0).title()
+
+    # If no known customer found, return the first meaningful word
+    # (skip dates, short tokens and service types)
+    for part in _FILENAME_SPLIT_RE.split(name_upper):
+        if len(part) > 3 and not part.isdigit() and part not in _SKIP_WORDS:
+            return part.title()
 
     return "Unknown Customer"
 
+# Keyword routing for the supervisor: (pattern, agent), first match wins. Retrieval
+# and analysis both run the fused retrieve-and-answer node. Topic questions that
+# say "summarise" (e.g. "Summarise KPI conditions") need retrieval, so only requests
+# to summarise a whole contract/document go to the summarizer.
+_ROUTE_PATTERNS = (
+    (re.compile(r"\b(?:risk|obligat|deadline|analy[sz]|terms?\b|payment|date|rate|price|cost|"
+                r"kpi|penalt|liabilit|terminat)"), "analyst"),
+    (re.compile(r"\b(?:summar(?:y|ies|i[sz]e)|overview)\b[^.?!]*\b(?:contracts?|agreements?|documents?)\b"),
+     "summarizer"),
+)
+
+@functools.lru_cache(maxsize=1024)
+def _route_by_keywords(query_lower: str) -> Optional[str]:
+    """Return the agent for a lower-cased query by keyword, or None if ambiguous"""
+    for pattern, agent in _ROUTE_PATTERNS:
+        if pattern.search(query_lower):
+            return agent
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _get_splitter(max_seq_length: Optional[int] = None) -> "RecursiveCharacterTextSplitter":
+    """Build the chunk splitter once, measuring length in embedding-model tokens
+
+    max_seq_length is the embedder's input window (including special tokens);
+    the tokenizer's model_max_length is only used when the embedder reports none.
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(SETTINGS.embedding_model)
+    # CHUNK_SIZE / CHUNK_OVERLAP are token counts so chunks fit the model's window;
+    # the splitter counts content tokens only, so leave room for [CLS] / [SEP]
+    chunk_size, chunk_overlap = SETTINGS.chunk_size, SETTINGS.chunk_overlap
+    window = max_seq_length or tokenizer.model_max_length
+    max_tokens = window - tokenizer.num_special_tokens_to_add()
+    if chunk_size > max_tokens:
+        # Older configs gave CHUNK_SIZE in characters (e.g. 1200); the embedder would
+        # silently truncate such chunks, so most of each would never be embedded
+        logger.warning(
+            f"CHUNK_SIZE={chunk_size} exceeds the embedding model's {window}-token window "
+            f"(CHUNK_SIZE is in tokens); using {max_tokens}"
+        )
+        chunk_size = max_tokens
+        chunk_overlap = min(chunk_overlap, chunk_size // 5)
+    return RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+        tokenizer,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+
+def _format_chunk(doc: Document) -> str:
+    """Render a retrieved chunk with its customer / file / sheet header"""
+    # Include source information for each retrieved chunk
+    customer = doc.metadata.get('customer', 'Unknown Customer')
+    source = doc.metadata.get('source', 'Unknown')
+    source_info = f"[Customer: {customer} | File: {source}"
+    sheet_name = doc.metadata.get('sheet_name')
+    if sheet_name:
+        source_info += f" | Sheet: {sheet_name}"
+    return f"{source_info}]\n{doc.page_content.strip()}"
+
+def _read_xlsx_sheets(path: Union[str, IO[bytes]]) -> List[Tuple[str, str]]:
+    """Stream every sheet of an .xlsx workbook to text as (sheet_name, text) pairs"""
+    import openpyxl
+
+    # read_only streams rows from the XML instead of building the whole workbook
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = []
+        for worksheet in workbook.worksheets:
+            buffer = io.StringIO()
+            buffer.write(f"Sheet: {worksheet.title}\n\n")
+            for row in worksheet.iter_rows(values_only=True):
+                if all(value is None for value in row):
+                    continue
+                buffer.write("\t".join("" if value is None else str(value) for value in row))
+                buffer.write("\n")
+            sheets.append((worksheet.title, buffer.getvalue()))
+        return sheets
+    finally:
+        workbook.close()  # Release the file handle (file lock on Windows)
+
+def _read_xls_sheets(path: Union[str, IO[bytes]]) -> List[Tuple[str, str]]:
+    """Read every sheet of a legacy .xls workbook via pandas as (sheet_name, text) pairs"""
+    import pandas as pd
+
+    excel_file = pd.ExcelFile(path)
+    try:
+        sheets = []
+        for sheet_name in excel_file.sheet_names:
+            # Parse from the open workbook rather than re-reading the file per sheet
+            df = excel_file.parse(sheet_name=sheet_name)
+
+            # Convert DataFrame to tab-separated text (one pass, no column padding;
+            # matches the .xlsx reader's output)
+            sheet_text = f"Sheet: {sheet_name}\n\n"
+            sheet_text += df.to_csv(sep='\t', index=False, lineterminator='\n')
+            sheets.append((sheet_name, sheet_text))
+        return sheets
+    finally:
+        excel_file.close()  # Close Excel file to release file lock on Windows
+
+def _load_pdf(data, source: str) -> List[Document]:
+    """Extract one Document per PDF page from in-memory bytes"""
+    import pymupdf
+    # PyMuPDF (libmupdf) is the fastest extractor; fall back to pdfium (also
+    # native code) for files MuPDF cannot parse
+    try:
+        with pymupdf.open(stream=data, filetype="pdf") as pdf:
+            pages = [page.get_text() for page in pdf]
+    except Exception as e:
+        logger.warning(f"PyMuPDF failed on {source}, falling back to pypdfium2: {str(e)}")
+        import pypdfium2
+        pdf = pypdfium2.PdfDocument(bytes(data))
+        try:
+            pages = [page.get_textpage().get_text_range() for page in pdf]
+        finally:
+            pdf.close()
+    return [
+        Document(page_content=text, metadata={'source': source, 'page': i})
+        for i, text in enumerate(pages)
+    ]
+
+@st.cache_resource
+def _get_llm() -> "ChatGroq":
+    """Create the Groq chat model once per process"""
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        api_key=SETTINGS.groq_api_key,
+        model=SETTINGS.groq_model,
+        temperature=SETTINGS.groq_temperature,
+        max_tokens=SETTINGS.groq_max_tokens,
+        streaming=True  # Enable streaming
+    )
+
+@st.cache_resource
+def _get_embeddings() -> Embeddings:
+    """Load the embedding model once per process instead of on every rerun"""
+    logger.info(f"Loading embeddings model: {SETTINGS.embedding_model} ({SETTINGS.embedding_backend})")
+    if SETTINGS.embedding_backend == "onnx-int8":
+        from embeddings import OptimumEmbeddings
+        embeddings = OptimumEmbeddings(
+            SETTINGS.embedding_model,
+            batch_size=SETTINGS.embedding_batch_size
+        )
+        logger.info("Embeddings loaded successfully")
+        return embeddings
+    from embeddings import SentenceTransformerEmbeddings
+    embeddings = SentenceTransformerEmbeddings(
+        SETTINGS.embedding_model,
+        device=SETTINGS.embedding_device,
+        batch_size=SETTINGS.embedding_batch_size,
+        compile_model=SETTINGS.embedding_compile,
+        dtype=SETTINGS.embedding_dtype
+    )
+    logger.info("Embeddings loaded successfully")
+    return embeddings
+
 class ContractRAGSystem:
     """Main RAG system for contract analysis"""
 
@@ -75,31 +266,92 @@ class ContractRAGSystem:
             # Validate configuration
             validate_config()
 
-            # Initialize LLM with updated configuration
-            self.llm = ChatGroq(
-                api_key=GROQ_API_KEY,
-                model=GROQ_MODEL,
-                temperature=GROQ_TEMPERATURE,
-                max_tokens=GROQ_MAX_TOKENS,
-                streaming=True  # Enable streaming
-            )
-
-            # Initialize proper HuggingFace embeddings
-            logger.info(f"Loading embeddings model: {EMBEDDING_MODEL}")
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=EMBEDDING_MODEL,
-                model_kwargs={'device': EMBEDDING_DEVICE},
-                encode_kwargs={'normalize_embeddings': True}
-            )
-            logger.info("Embeddings loaded successfully")
+            # LLM is shared process-wide across reruns and sessions; embeddings load on first use
+            self.llm = _get_llm()
 
             self.vector_store = None
             self.retriever = None
+            # Chroma's in-memory client is process-wide; a per-instance collection
+            # keeps each session's contracts private
+            self._collection_name = f"contracts_{uuid.uuid4().hex}"
+            # Built on first use by create_tools() / create_supervisor()
+            self._tools = None
+            self._supervisor = None
+            # (matrix, texts, metadatas) while the collection is small enough to brute-force
+            self._flat_index = None
+            # Identifies the indexed document set; keys the per-question answer cache
+            self.doc_fingerprint = ""
+            # Chunks in the vector store, refreshed on each ingest
+            self.chunk_count = 0
+            # Formatted retrieval results prefetched for known questions (normalized text -> context)
+            self.prefetched_contexts: Dict[str, str] = {}
+            # Formatted retrieval results for near-duplicate queries
+            from semantic_cache import SemanticCache
+            self.semantic_cache = SemanticCache(
+                threshold=SETTINGS.semantic_cache_threshold,
+                max_entries=SETTINGS.semantic_cache_size
+            )
 
         except Exception as e:
             logger.error(f"Error initializing RAG system: {str(e)}")
             raise
         
+    @functools.cached_property
+    def embeddings(self) -> Embeddings:
+        """Embedding model, loaded when documents are first processed (shared process-wide)"""
+        return _get_embeddings()
+
+    def _load_file(self, uploaded_file, customer_name: str) -> Tuple[List[Document], Optional[str]]:
+        """Load one uploaded file into Documents; returns (documents, warning message or None)"""
+        warning = None
+
+        # Load document based on type; everything is parsed from the upload buffer
+        if uploaded_file.name.endswith('.pdf'):
+            documents = _load_pdf(uploaded_file.getbuffer(), uploaded_file.name)
+
+        elif uploaded_file.name.endswith('.xlsx') or uploaded_file.name.endswith('.xls'):
+            # Parse the workbook from the upload buffer (no temp file)
+            workbook_data = io.BytesIO(uploaded_file.getbuffer())
+
+            # Load Excel file with all sheets
+            try:
+                if uploaded_file.name.endswith('.xlsx'):
+                    sheets = _read_xlsx_sheets(workbook_data)
+                else:
+                    sheets = _read_xls_sheets(workbook_data)
+
+                documents = [
+                    Document(
+                        page_content=sheet_text,
+                        metadata={
+                            'source': uploaded_file.name,
+                            'sheet_name': sheet_name,
+                            'customer': customer_name
+                        }
+                    )
+                    for sheet_name, sheet_text in sheets
+                ]
+                logger.info(f"Loaded {len(documents)} sheets from {uploaded_file.name}")
+            except Exception as e:
+                logger.error(f"Error reading Excel file {uploaded_file.name}: {str(e)}")
+                warning = f"Could not process Excel file {uploaded_file.name}: {str(e)}"
+                documents = []
+
+        else:
+            # Text file
+            text = bytes(uploaded_file.getbuffer()).decode('utf-8', errors='replace')
+            documents = [Document(page_content=text, metadata={'source': uploaded_file.name})]
+
+        # Add metadata to all documents
+        for doc in documents:
+            if 'source' not in doc.metadata:
+                doc.metadata['source'] = uploaded_file.name
+            doc.metadata['upload_time'] = datetime.now().isoformat()
+            doc.metadata['customer'] = customer_name
+
+        logger.info(f"Processed {uploaded_file.name} - Customer: {customer_name}, Documents: {len(documents)}")
+        return documents, warning
+
     def process_documents(self, uploaded_files) -> bool:
         """Process uploaded contract documents including Excel files with multiple sheets"""
         try:
@@ -114,104 +366,97 @@ class ContractRAGSystem:
                     batch_customer_name = detected_name
                     break  # Found a customer name, use it for all files
 
+            # Parse files one at a time: PyMuPDF does not support multithreading and
+            # PDFium is not thread-safe, so a thread pool gave no speedup anyway
             for uploaded_file in uploaded_files:
-                # Use the batch customer name for all files
-                customer_name = batch_customer_name
-
-                # Save uploaded file temporarily
-                with tempfile.NamedTemporaryFile(delete=False, suffix=uploaded_file.name) as tmp_file:
-                    tmp_file.write(uploaded_file.getbuffer())
-                    tmp_file_path = tmp_file.name
-
-                # Load document based on type
-                if uploaded_file.name.endswith('.pdf'):
-                    loader = PyPDFLoader(tmp_file_path)
-                    documents = loader.load()
-
-                elif uploaded_file.name.endswith('.xlsx') or uploaded_file.name.endswith('.xls'):
-                    # Load Excel file with all sheets
-                    try:
-                        excel_file = pd.ExcelFile(tmp_file_path)
-                        documents = []
-
-                        for sheet_name in excel_file.sheet_names:
-                            df = pd.read_excel(tmp_file_path, sheet_name=sheet_name)
-
-                            # Convert DataFrame to text
-                            sheet_text = f"Sheet: {sheet_name}\n\n"
-                            sheet_text += df.to_string(index=False)
-
-                            # Create Document object
-                            doc = Document(
-                                page_content=sheet_text,
-                                metadata={
-                                    'source': uploaded_file.name,
-                                    'sheet_name': sheet_name,
-                                    'customer': customer_name
-                                }
-                            )
-                            documents.append(doc)
-
-                        logger.info(f"Loaded {len(excel_file.sheet_names)} sheets from {uploaded_file.name}")
-                        excel_file.close()  # Close Excel file to release file lock on Windows
-                    except Exception as e:
-                        logger.error(f"Error reading Excel file {uploaded_file.name}: {str(e)}")
-                        st.warning(f"Could not process Excel file {uploaded_file.name}: {str(e)}")
-                        documents = []
-
-                else:
-                    # Text file
-                    loader = TextLoader(tmp_file_path)
-                    documents = loader.load()
-
-                # Add metadata to all documents
-                for doc in documents:
-                    if 'source' not in doc.metadata:
-                        doc.metadata['source'] = uploaded_file.name
-                    doc.metadata['upload_time'] = datetime.now().isoformat()
-                    doc.metadata['customer'] = customer_name
-
+                documents, warning = self._load_file(uploaded_file, batch_customer_name)
+                if warning:
+                    st.warning(warning)
                 all_documents.extend(documents)
-                logger.info(f"Processed {uploaded_file.name} - Customer: {customer_name}, Documents: {len(documents)}")
-
-                # Clean up temp file
-                os.unlink(tmp_file_path)
 
             # Split documents into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=CHUNK_SIZE,
-                chunk_overlap=CHUNK_OVERLAP,
-                length_function=len,
-                separators=["\n\n", "\n", ". ", " ", ""]
-            )
+            text_splitter = _get_splitter(getattr(self.embeddings, "max_seq_length", None))
 
             splits = text_splitter.split_documents(all_documents)
             logger.info(f"Created {len(splits)} document chunks from {len(all_documents)} documents")
 
+            from langchain_community.vectorstores import Chroma
+
             # Create vector store (in-memory for Streamlit Cloud compatibility)
             # On Streamlit Cloud, persist_directory doesn't work reliably
             # Store in session state instead for persistence across interactions
             try:
-                self.vector_store = Chroma.from_documents(
-                    documents=splits,
-                    embedding=self.embeddings,
-                    collection_name="contracts"
-                    # Removed persist_directory for Streamlit Cloud compatibility
-                )
-                logger.info(f"Vector store created successfully with {len(splits)} chunks")
+                # Content-addressed ids make re-uploads idempotent: a chunk that is
+                # already indexed keeps its id. The source is part of the id so
+                # shared boilerplate keeps one entry per file.
+                unique = {}
+                for doc in splits:
+                    key = f"{doc.metadata.get('source', '')}\0{doc.page_content}"
+                    unique.setdefault(hashlib.md5(key.encode("utf-8")).hexdigest(), doc)
+
+                # Reuse the store across uploads; chunks already indexed (same file
+                # re-uploaded) are skipped before any embedding work
+                if self.vector_store is None:
+                    self.vector_store = Chroma(
+                        collection_name=self._collection_name,
+                        embedding_function=self.embeddings,
+                        collection_metadata=_COLLECTION_METADATA
+                        # Removed persist_directory for Streamlit Cloud compatibility
+                    )
+                if unique:
+                    existing = self.vector_store._collection.get(ids=list(unique), include=[])["ids"]
+                    for chunk_id in existing:
+                        del unique[chunk_id]
+                    logger.info(f"Skipping {len(existing)} chunks already in the vector store")
+
+                ids = list(unique)
+                texts = [doc.page_content for doc in unique.values()]
+                metadatas = [doc.metadata for doc in unique.values()]
+
+                # Embed each distinct text once in a single batched call (boilerplate
+                # clauses repeat across files), then scatter vectors back per chunk
+                text_index = {}
+                for text in texts:
+                    text_index.setdefault(text, len(text_index))
+                unique_vectors = self.embeddings.embed_documents(list(text_index))
+                vectors = [unique_vectors[text_index[text]] for text in texts]
+                logger.info(f"Embedded {len(text_index)} distinct texts for {len(splits)} chunks")
+
+                if texts:
+                    self.vector_store._collection.upsert(
+                        ids=ids,
+                        embeddings=vectors,
+                        documents=texts,
+                        metadatas=metadatas
+                    )
+                logger.info(f"Vector store updated with {len(ids)} new chunks")
             except Exception as e:
                 logger.error(f"Error creating vector store: {e}")
                 # Fallback: try with explicit in-memory
                 self.vector_store = Chroma.from_documents(
                     documents=splits,
-                    embedding=self.embeddings
+                    embedding=self.embeddings,
+                    collection_name=self._collection_name,
+                    collection_metadata=_COLLECTION_METADATA
                 )
                 logger.info("Vector store created with fallback method")
 
-            # Create retriever with similarity search
+            # Cached results refer to the previous document set
+            self.semantic_cache.clear()
+            # JIT-compile the search kernel under the upload spinner, not on the first question
+            from utils_fast import prewarm
+            prewarm()
+            self.prefetched_contexts.clear()
+            # Chunk ids are content hashes, so equal stores share a fingerprint
+            stored_ids = self.vector_store._collection.get(include=[])["ids"]
+            self.doc_fingerprint = hashlib.sha1("\n".join(sorted(stored_ids)).encode()).hexdigest()
+            self.chunk_count = len(stored_ids)
+            self._refresh_flat_index()
+
+            # Retriever for LangChain chain integration (the tools search the store directly)
             self.retriever = self.vector_store.as_retriever(
                 search_type="similarity",
-                search_kwargs={"k": TOP_K_RESULTS}
+                search_kwargs={"k": SETTINGS.top_k_results}
             )
 
             return True
@@ -221,52 +466,106 @@ class ContractRAGSystem:
             logger.error(f"Error details: {str(e)}", exc_info=True)
             return False
     
+    def prefetch_contexts(self, questions: Sequence[str]) -> None:
+        """Retrieve context for known questions up front with one batched embedding call
+
+        retrieve_contract_info serves these questions from memory, skipping the
+        query embedding and the vector search.
+        """
+        if not self.vector_store or not questions:
+            return
+        try:
+            vectors = self.embeddings.embed_documents(list(questions))
+            for question, vector in zip(questions, vectors):
+                relevant_docs = self._rerank_search(vector, SETTINGS.top_k_results)
+                if relevant_docs:
+                    self.prefetched_contexts[question.strip().lower()] = "\n\n".join(
+                        _format_chunk(doc) for doc in relevant_docs
+                    )
+            logger.info(f"Prefetched context for {len(self.prefetched_contexts)} questions")
+        except Exception as e:
+            # Only an optimization: questions fall back to retrieval at click time
+            logger.error(f"Error prefetching question contexts: {str(e)}", exc_info=True)
+
+    def _refresh_flat_index(self) -> None:
+        """Mirror a small collection into an in-memory matrix for brute-force search"""
+        self._flat_index = None
+        count = self.chunk_count
+        if not 0 < count <= SETTINGS.flat_index_max_chunks:
+            return
+        data = self.vector_store._collection.get(include=["embeddings", "documents", "metadatas"])
+        import numpy as np
+        self._flat_index = (
+            np.asarray(data["embeddings"], dtype=np.float32),
+            data["documents"],
+            data["metadatas"],
+        )
+        logger.info(f"Using flat in-memory index for {count} chunks")
+
+    def _rerank_search(self, query_vector: List[float], k: int) -> List[Document]:
+        """Return the k best chunks by exact cosine similarity
+
+        Small collections are scanned in full from the flat in-memory index;
+        larger ones fetch RERANK_CANDIDATE_FACTOR*k approximate (HNSW) candidates and rerank those.
+        """
+        from utils_fast import topk_cosine
+
+        if self._flat_index is not None:
+            # One matrix-vector product over every chunk beats HNSW traversal at this size
+            matrix, texts, metadatas = self._flat_index
+            best, _ = topk_cosine(matrix, query_vector, k)
+            return [Document(page_content=texts[i], metadata=metadatas[i] or {}) for i in best]
+
+        found = self.vector_store._collection.query(
+            query_embeddings=[query_vector],
+            n_results=RERANK_CANDIDATE_FACTOR * k,
+            include=["documents", "metadatas", "embeddings"]
+        )
+        texts = found["documents"][0]
+        if not texts:
+            return []
+        # One matrix-vector product over the candidates (unit vectors: dot == cosine)
+        best, _ = topk_cosine(found["embeddings"][0], query_vector, k)
+        metadatas = found["metadatas"][0]
+        return [Document(page_content=texts[i], metadata=metadatas[i] or {}) for i in best]
+
     def create_tools(self):
-        """Create tools for the agents"""
-        
+        """Create tools for the agents (built once; they read self's state at call time)"""
+        if self._tools is not None:
+            return self._tools
+
         @tool
         def retrieve_contract_info(
             query: Annotated[str, "The query to search for in the contracts"]
         ) -> str:
             """Search and retrieve relevant information from contract documents"""
-            if not self.retriever:
+            # Search the vector store directly; self.retriever is only kept for
+            # LangChain chain integration
+            if not self.vector_store:
                 return "No contracts loaded. Please upload contract documents first."
 
-            try:
-                # Debug: Check if vector store exists
-                if not self.vector_store:
-                    return "Vector store not initialized. Please process documents first."
+            prefetched = self.prefetched_contexts.get(query.strip().lower())
+            if prefetched is not None:
+                return prefetched
 
-                # Retrieve relevant documents using invoke for better compatibility
-                relevant_docs = self.retriever.invoke(query)
+            try:
+                # Near-duplicate queries (e.g. quick-analysis buttons) reuse the cached result
+                query_vector = self.embeddings.embed_query(query)
+                cached = self.semantic_cache.lookup(query_vector)
+                if cached is not None:
+                    logger.info("Semantic cache hit")
+                    return cached
 
-                if not relevant_docs or len(relevant_docs) == 0:
-                    # Try direct similarity search as fallback
-                    try:
-                        relevant_docs = self.vector_store.similarity_search(query, k=8)
-                    except:
-                        pass
+                # Search with the query embedding computed above
+                relevant_docs = self._rerank_search(query_vector, SETTINGS.top_k_results)
 
                 if not relevant_docs:
                     return "No relevant information found in the contracts."
 
                 # Format the retrieved information with source tracking
-                result = ""
-                for i, doc in enumerate(relevant_docs, 1):
-                    source = doc.metadata.get('source', 'Unknown')
-                    customer = doc.metadata.get('customer', 'Unknown Customer')
-                    sheet_name = doc.metadata.get('sheet_name', None)
-                    content = doc.page_content.strip()
-
-                    # Include source information for each retrieved chunk
-                    source_info = f"[Customer: {customer} | File: {source}"
-                    if sheet_name:
-                        source_info += f" | Sheet: {sheet_name}"
-                    source_info += "]\n"
-
-                    result += source_info + content + "\n\n"
-
-                return result.strip()
+                result = "\n\n".join(_format_chunk(doc) for doc in relevant_docs)
+                self.semantic_cache.add(query_vector, result)
+                return result
 
             except Exception as e:
                 logger.error(f"Retrieval error: {str(e)}")
@@ -309,16 +608,12 @@ class ContractRAGSystem:
         ) -> str:
             """Generate a concise summary of the contract"""
             try:
-                summary_prompt = f"""
-                {SUMMARIZER_PROMPT}
-
-                Contract Text:
-                {contract_text}
-
-                Please provide a comprehensive yet concise summary of this contract.
-                """
+                summary_request = (
+                    f"Contract Text:\n{contract_text}\n\n"
+                    "Please provide a comprehensive yet concise summary of this contract."
+                )
 
-                summary = self.llm.invoke([HumanMessage(content=summary_prompt)]).content
+                summary = self.llm.invoke([_SUMMARIZER_SYSTEM, HumanMessage(content=summary_request)]).content
 
                 return summary
 
@@ -432,10 +727,23 @@ Gap Analysis:
             except Exception as e:
                 return f"Error checking KPI compliance: {str(e)}"
 
-        return retrieve_contract_info, analyze_contract_terms, summarize_contract, calculate_trip_cost, check_kpi_compliance
+        self._tools = (
+            retrieve_contract_info, analyze_contract_terms, summarize_contract,
+            calculate_trip_cost, check_kpi_compliance
+        )
+        return self._tools
     
     def create_supervisor(self):
         """Create the supervisor multi-agent system using new LangGraph API"""
+        # The graph only reaches documents through the tools, so one compiled
+        # workflow serves every re-processing of documents
+        if self._supervisor is not None:
+            return self._supervisor
+
+        # LangGraph imports - Updated for new API
+        from langgraph.graph import StateGraph, START, END
+        from langgraph.prebuilt import ToolNode
+        from langgraph.checkpoint.memory import MemorySaver
 
         retrieve_tool, analyze_tool, summarize_tool, calc_cost_tool, kpi_check_tool = self.create_tools()
 
@@ -454,22 +762,16 @@ Gap Analysis:
             messages = state["messages"]
             last_message = messages[-1].content if messages else ""
 
-            # Create routing prompt
-            routing_prompt = f"""
-{SUPERVISOR_PROMPT}
+            # Queries are routed by keyword; anything unmatched goes to the retriever
+            # unless SUPERVISOR_LLM_ROUTING asks the LLM to decide
+            next_agent = _route_by_keywords(last_message.lower())
+            if next_agent is None and not SETTINGS.supervisor_llm_routing:
+                next_agent = "retriever"
+            if next_agent is not None:
+                logger.info(f"Supervisor routing to: {next_agent} (keyword)")
+                return {"messages": messages, "next": next_agent}
 
-User query: {last_message}
-
-Based on the query, decide which agent should handle this:
-- "retriever" - for finding information in contracts
-- "analyst" - for analyzing contract terms
-- "summarizer" - for summarizing contracts
-- "end" - if the query has been fully answered
-
-Respond with ONLY the agent name (retriever/analyst/summarizer/end).
-"""
-
-            response = self.llm.invoke([SystemMessage(content=routing_prompt)])
+            response = self.llm.invoke([_SUPERVISOR_SYSTEM, HumanMessage(content=f"User query: {last_message}")])
             next_agent = response.content.strip().lower()
 
             # Validate next agent
@@ -479,49 +781,23 @@ Respond with ONLY the agent name (retriever/analyst/summarizer/end).
             logger.info(f"Supervisor routing to: {next_agent}")
             return {"messages": messages, "next": next_agent}
 
-        def retriever_node(state: AgentState) -> AgentState:
-            """Retriever agent retrieves relevant contract information"""
+        def retrieve_and_answer_node(state: AgentState) -> AgentState:
+            """Retrieve relevant contract information and answer the question in one step"""
             messages = state["messages"]
-            last_message = messages[-1].content if messages else ""
-
-            # Create retrieval prompt
-            prompt = f"{RETRIEVER_PROMPT}\n\nQuery: {last_message}"
+            user_question = messages[-1].content if messages else ""
 
             # Use the retrieve tool
-            tool_result = retrieve_tool.invoke(last_message)
+            context = retrieve_tool.invoke(user_question)
 
-            response = AIMessage(content=f"Retrieved Information:\n{tool_result}")
-            return {"messages": messages + [response], "next": "analyst"}
-
-        def analyst_node(state: AgentState) -> AgentState:
-            """Analyst agent analyzes the retrieved information"""
-            messages = state["messages"]
-
-            # Get the original user question
-            user_question = ""
-            for msg in messages:
-                if isinstance(msg, HumanMessage):
-                    user_question = msg.content
-                    break
-
-            # Get the last retrieval result
-            context = ""
-            for msg in reversed(messages):
-                if isinstance(msg, AIMessage) and "Retrieved Information" in msg.content:
-                    context = msg.content
-                    break
-
-            # Create analysis prompt with user's question
-            prompt = f"""{ANALYST_PROMPT}
-
-User's Question: {user_question}
+            # Static system prompt first so Groq can reuse the cached prefix
+            question = f"""User's Question: {user_question}
 
 Retrieved Contract Information:
 {context}
 
 Answer the user's question directly and concisely based on the retrieved information above."""
 
-            response = self.llm.invoke([SystemMessage(content=prompt)])
+            response = self.llm.invoke([_ANALYST_SYSTEM, HumanMessage(content=question)])
             return {"messages": messages + [response], "next": "end"}
 
         def summarizer_node(state: AgentState) -> AgentState:
@@ -537,8 +813,7 @@ Answer the user's question directly and concisely based on the retrieved informa
 
         # Add nodes to workflow
         workflow.add_node("supervisor", supervisor_node)
-        workflow.add_node("retriever", retriever_node)
-        workflow.add_node("analyst", analyst_node)
+        workflow.add_node("retrieve_and_answer", retrieve_and_answer_node)
         workflow.add_node("summarizer", summarizer_node)
 
         # Define routing logic
@@ -555,25 +830,158 @@ Answer the user's question directly and concisely based on the retrieved informa
             "supervisor",
             route_supervisor,
             {
-                "retriever": "retriever",
-                "analyst": "analyst",
+                # Retrieval and analysis both run the fused node
+                "retriever": "retrieve_and_answer",
+                "analyst": "retrieve_and_answer",
                 "summarizer": "summarizer",
                 "__end__": END
             }
         )
-        workflow.add_edge("retriever", "analyst")
-        workflow.add_edge("analyst", END)
+        workflow.add_edge("retrieve_and_answer", END)
         workflow.add_edge("summarizer", END)
 
         # Compile with memory
         memory = MemorySaver()
         app = workflow.compile(checkpointer=memory)
 
-        logger.info("Supervisor workflow compiled successfully")
+        logger.info(
+            f"Supervisor workflow compiled successfully (prompts: supervisor={SUPERVISOR_PROMPT_HASH}, "
+            f"retriever={RETRIEVER_PROMPT_HASH}, analyst={ANALYST_PROMPT_HASH}, summarizer={SUMMARIZER_PROMPT_HASH})"
+        )
+        self._supervisor = app
         return app
 
+
+# Minimum seconds between streamed UI updates (~20 Hz)
+_STREAM_FLUSH_INTERVAL = 0.05
+
+
+def coalesce_tokens(tokens: Iterator[str], interval: float = _STREAM_FLUSH_INTERVAL) -> Iterator[str]:
+    """Re-yield a token stream in chunks at most once per interval, so each UI update carries many tokens"""
+    buf = ""
+    last = time.monotonic()
+    for token in tokens:
+        buf += token
+        now = time.monotonic()
+        if now - last >= interval:
+            yield buf
+            buf = ""
+            last = now
+    # Final flush once the stream ends
+    if buf:
+        yield buf
+
+
+async def ainvoke_question(supervisor, question: str) -> str:
+    """Run one question through the supervisor graph asynchronously and return the answer text
+
+    The thread_id is derived from the normalized question, so single and batch
+    runs of the same question share one conversation thread.
+    """
+    thread_id = f"question_{hashlib.md5(question.strip().lower().encode()).hexdigest()}"
+    response = await supervisor.ainvoke(
+        {"messages": [HumanMessage(content=question)], "next": ""},
+        config={"configurable": {"thread_id": thread_id}}
+    )
+    return response["messages"][-1].content if response.get("messages") else "No response"
+
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def answer_question(_supervisor, doc_fingerprint: str, normalized_question: str, _question: str) -> str:
+    """Answer a question through the supervisor graph, cached per document set and question
+
+    Only doc_fingerprint and normalized_question form the cache key (underscored
+    arguments are not hashed); _question is sent to the graph as typed.
+    """
+    return asyncio.run(ainvoke_question(_supervisor, _question))
+
+
+# Questions answered at once by "Run all"; graph calls are network-bound
+_BATCH_CONCURRENCY = 6
+
+
+async def answer_questions(supervisor, doc_fingerprint: str, questions: Sequence[str],
+                           concurrency: int = _BATCH_CONCURRENCY) -> List[str]:
+    """Answer questions concurrently through the cached answer_question, in input order
+
+    Answers land in the same cache as single questions, so a later click on one
+    of them is served without another graph run. A failed question yields an
+    error message instead of aborting the batch.
+    """
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    sem = asyncio.Semaphore(concurrency)
+    ctx = get_script_run_ctx()
+
+    def cached_answer(question: str) -> str:
+        # Worker threads need the script context for st.cache_data
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return answer_question(supervisor, doc_fingerprint, question.strip().lower(), question)
+
+    async def answer(idx: int, question: str) -> str:
+        async with sem:
+            try:
+                return await asyncio.to_thread(cached_answer, question)
+            except Exception as e:
+                logger.error(f"Error in Q{idx}: {str(e)}")
+                return f"Error: {str(e)}"
+
+    return await asyncio.gather(*(answer(idx, q) for idx, q in enumerate(questions, 1)))
+
+
+# Frequent questions from questions.csv, offered in the Analysis Options panel
+_QUESTIONS = (
+    "What is customers name?",
+    "What is the customers sector?",
+    "Which product do customers offer?",
+    "When is the deadline?",
+    "How many rounds is the tender?",
+    "What is the service type? Explain regularly intermodal, short-sea, road, rail",
+    "Which types of equipment / vehicle are in demand?",
+    "What is the ADR conditions?",
+    "If the contract mentions the existence of any ADR, summarise its type.",
+    "Whats is the ADR class types?",
+    "If the contract mentions the existence of any temperature controlled or reefer or frigo, summarise its type and tell me what is the ratings?",
+    "What is the payment term?",
+    "What is the Expected Go-Live Date?",
+    "How long is price validity?",
+    "Is contract mentions double driver?",
+    "Is contract mentions safety equipments? If the contract mentions safety conditions, summarise.",
+    "What is pre-advise? When does the customer request a vehicle and how long do we have to fulfil the request?",
+    "Summarise KPI conditions. Is there any penalty or demurrage fee?",
+    "If contract contain, free time costs, weekend loading, Summarise",
+    "Summarise if there are FSC requirements",
+    "What is the base fuel rate?",
+    "What is the fuel effect ratio?",
+)
+# Static selectbox labels, built once
+_QUESTION_LABELS = tuple(
+    f"Q{i}: {q[:60]}{'...' if len(q) > 60 else ''}" for i, q in enumerate(_QUESTIONS, 1)
+)
+
+
+def add_chat_message(role: str, content: str) -> None:
+    """Append a message to the session chat history"""
+    st.session_state.chat_history.append({"role": role, "content": content})
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def format_conversation(messages: Tuple[Tuple[str, str], ...]) -> str:
+    """Plain-text export body of (role, content) chat messages (the dated header is added by the caller)"""
+    conversation_text = ""
+    for i, (role, content) in enumerate(messages, 1):
+        if role == "user":
+            conversation_text += f"QUESTION {i//2 + 1}:\n"
+            conversation_text += f"{content}\n\n"
+        else:
+            conversation_text += f"ANSWER:\n"
+            conversation_text += f"{content}\n\n"
+            conversation_text += "-" * 80 + "\n\n"
+    return conversation_text
+
 # Streamlit UI
 def main():
+    configure_logging()
     st.set_page_config(
         page_title="Contract Analysis RAG System",
         page_icon="📄",
@@ -692,6 +1100,27 @@ def main():
             transform: translateY(0px) !important;
         }
 
+        /* Statistics cards (st.metric) */
+        div[data-testid="stMetric"] {
+            background: white;
+            padding: 15px;
+            border-radius: 8px;
+            margin: 10px 0;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+            border-left: 3px solid #667eea;
+        }
+        div[data-testid="stMetricLabel"] p {
+            color: #666;
+            font-size: 12px;
+            font-weight: 600;
+            text-transform: uppercase;
+        }
+        div[data-testid="stMetricValue"] {
+            color: #667eea;
+            font-size: 32px;
+            font-weight: 700;
+        }
+
         /* Button icons */
         .stButton>button>div {
             display: flex;
@@ -762,6 +1191,8 @@ def main():
                 with st.spinner("Processing documents..."):
                     if st.session_state.rag_system.process_documents(uploaded_files):
                         st.success(f"✓ Processed {len(uploaded_files)} documents")
+                        # Frequent questions skip retrieval at click time
+                        st.session_state.rag_system.prefetch_contexts(_QUESTIONS)
                         st.session_state.supervisor = st.session_state.rag_system.create_supervisor()
                     else:
                         st.error("Failed to process documents")
@@ -794,20 +1225,14 @@ def main():
         if st.session_state.chat_history:
             st.markdown("#### 💾 Export Conversation")
 
-            # Create formatted text version
+            # Body serialized once per distinct history; the header carries the current date
             conversation_text = "CONTRACT ANALYSIS CONVERSATION\n"
             conversation_text += "=" * 80 + "\n"
             conversation_text += f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
             conversation_text += "=" * 80 + "\n\n"
-
-            for i, message in enumerate(st.session_state.chat_history, 1):
-                if message["role"] == "user":
-                    conversation_text += f"QUESTION {i//2 + 1}:\n"
-                    conversation_text += f"{message['content']}\n\n"
-                else:
-                    conversation_text += f"ANSWER:\n"
-                    conversation_text += f"{message['content']}\n\n"
-                    conversation_text += "-" * 80 + "\n\n"
+            conversation_text += format_conversation(
+                tuple((m["role"], m["content"]) for m in st.session_state.chat_history)
+            )
 
             # Download as TXT (readable in any text editor or Word)
             st.download_button(
@@ -839,10 +1264,7 @@ def main():
                 st.warning("Please upload and process documents first!")
             else:
                 # Add user message
-                st.session_state.chat_history.append({
-                    "role": "user",
-                    "content": prompt
-                })
+                add_chat_message("user", prompt)
                 
                 with st.chat_message("user"):
                     st.write(prompt)
@@ -850,34 +1272,43 @@ def main():
                 # Get response with streaming
                 with st.chat_message("assistant"):
                     try:
-                        # Create a placeholder for streaming
-                        response_placeholder = st.empty()
-                        full_response = ""
-
-                        # Invoke supervisor with streaming
+                        # Stream answer tokens as they are generated; "values" events
+                        # carry the final state once the graph finishes
                         config = {"configurable": {"thread_id": "streamlit_session"}}
+                        final_state = {}
 
-                        with st.spinner("Analyzing contracts..."):
-                            result = st.session_state.supervisor.invoke(
+                        def answer_tokens():
+                            for mode, payload in st.session_state.supervisor.stream(
                                 {"messages": [HumanMessage(content=prompt)], "next": ""},
-                                config=config
-                            )
-
-                            # Extract the final response
-                            if "messages" in result and len(result["messages"]) > 0:
-                                ai_response = result["messages"][-1].content
-                                full_response = ai_response
+                                config=config,
+                                stream_mode=["messages", "values"]
+                            ):
+                                if mode == "messages":
+                                    chunk, metadata = payload
+                                    # Skip the supervisor's routing tokens
+                                    if metadata.get("langgraph_node") in _ANSWER_NODES and chunk.content:
+                                        yield chunk.content
+                                else:
+                                    final_state.update(payload)
+
+                        # Batch tokens so the chat re-renders ~20 times a second, not once per token.
+                        # Partial output is shown as plain text; markdown is parsed once at the end
+                        response_placeholder = st.empty()
+                        full_response = ""
+                        for text in coalesce_tokens(answer_tokens()):
+                            full_response += text
+                            response_placeholder.text(full_response + "▌")
+
+                        # Nothing streamed (e.g. a non-streaming node): use the final message instead
+                        if not full_response:
+                            if final_state.get("messages"):
+                                full_response = final_state["messages"][-1].content
                             else:
                                 full_response = "I apologize, but I couldn't generate a response. Please try again."
-
-                        # Display the response
-                        response_placeholder.write(full_response)
+                        response_placeholder.markdown(full_response)
 
                         # Add to history
-                        st.session_state.chat_history.append({
-                            "role": "assistant",
-                            "content": full_response
-                        })
+                        add_chat_message("assistant", full_response)
 
                     except Exception as e:
                         logger.error(f"Error processing query: {str(e)}", exc_info=True)
@@ -910,70 +1341,59 @@ def main():
                 <h3 style="color: #667eea; margin: 0 0 10px 0; font-size: 18px;">
                     ❓ Frequent Questions (23)
                 </h3>
-                <p style="color: #666; margin: 0; font-size: 13px;">Click any question to analyze contracts</p>
+                <p style="color: #666; margin: 0; font-size: 13px;">Pick a question to analyze contracts</p>
             </div>
         """, unsafe_allow_html=True)
 
-        # 23 Questions from questions.csv
-        questions = [
-            "What is customers name?",
-            "What is the customers sector?",
-            "Which product do customers offer?",
-            "When is the deadline?",
-            "How many rounds is the tender?",
-            "What is the service type? Explain regularly intermodal, short-sea, road, rail",
-            "Which types of equipment / vehicle are in demand?",
-            "What is the ADR conditions?",
-            "If the contract mentions the existence of any ADR, summarise its type.",
-            "Whats is the ADR class types?",
-            "If the contract mentions the existence of any temperature controlled or reefer or frigo, summarise its type and tell me what is the ratings?",
-            "What is the payment term?",
-            "What is the Expected Go-Live Date?",
-            "How long is price validity?",
-            "Is contract mentions double driver?",
-            "Is contract mentions safety equipments? If the contract mentions safety conditions, summarise.",
-            "What is pre-advise? When does the customer request a vehicle and how long do we have to fulfil the request?",
-            "Summarise KPI conditions. Is there any penalty or demurrage fee?",
-            "If contract contain, free time costs, weekend loading, Summarise",
-            "Summarise if there are FSC requirements",
-            "What is the base fuel rate?",
-            "What is the fuel effect ratio?"
-        ]
-
-        # Create scrollable container
-        with st.container():
-            for idx, question in enumerate(questions, 1):
-                # Shorter label for button
-                btn_label = f"Q{idx}: {question[:50]}{'...' if len(question) > 50 else ''}"
-
-                if st.button(btn_label, key=f"q_{idx}", use_container_width=True, help=question):
-                    if not st.session_state.supervisor:
-                        st.warning("Please upload and process documents first!")
-                    else:
-                        with st.spinner(f"Analyzing Q{idx}..."):
-                            try:
-                                config = {"configurable": {"thread_id": f"question_{idx}"}}
-                                response = st.session_state.supervisor.invoke({
-                                    "messages": [HumanMessage(content=question)],
-                                    "next": ""
-                                }, config=config)
-                                ai_response = response["messages"][-1].content if response.get("messages") else "No response"
-
-                                # Add to chat history (answers will appear in the main chat interface on the left)
-                                st.session_state.chat_history.append({
-                                    "role": "user",
-                                    "content": question
-                                })
-                                st.session_state.chat_history.append({
-                                    "role": "assistant",
-                                    "content": ai_response
-                                })
-
-                                # Trigger rerun to display the answer in chat interface
-                                st.rerun()
-                            except Exception as e:
-                                logger.error(f"Error in Q{idx}: {str(e)}")
-                                st.error(f"Error: {str(e)}")
+        if st.button(f"▶ Run all {len(_QUESTIONS)}", key="q_all", use_container_width=True):
+            if not st.session_state.supervisor:
+                st.warning("Please upload and process documents first!")
+            else:
+                with st.spinner(f"Analyzing {len(_QUESTIONS)} questions..."):
+                    answers = asyncio.run(answer_questions(
+                        st.session_state.supervisor,
+                        st.session_state.rag_system.doc_fingerprint,
+                        _QUESTIONS
+                    ))
+                # One history update and one rerun for the whole batch
+                for question, ai_response in zip(_QUESTIONS, answers):
+                    add_chat_message("user", question)
+                    add_chat_message("assistant", ai_response)
+                st.rerun()
+
+        # One selectbox + submit button instead of a widget per question
+        with st.form("frequent_question"):
+            idx = st.selectbox(
+                "Frequent Question",
+                range(1, len(_QUESTIONS) + 1),
+                format_func=lambda i: _QUESTION_LABELS[i - 1]
+            )
+            submitted = st.form_submit_button("Analyze", use_container_width=True)
+
+        if submitted:
+            question = _QUESTIONS[idx - 1]
+            if not st.session_state.supervisor:
+                st.warning("Please upload and process documents first!")
+            else:
+                with st.spinner(f"Analyzing Q{idx}..."):
+                    try:
+                        # Repeat questions on the same documents are served from cache
+                        ai_response = answer_question(
+                            st.session_state.supervisor,
+                            st.session_state.rag_system.doc_fingerprint,
+                            question.strip().lower(),
+                            question
+                        )
+
+                        # Add to chat history (answers will appear in the main chat interface on the left)
+                        add_chat_message("user", question)
+                        add_chat_message("assistant", ai_response)
+
+                        # Trigger rerun to display the answer in chat interface
+                        st.rerun()
+                    except Exception as e:
+                        logger.error(f"Error in Q{idx}: {str(e)}")
+                        st.error(f"Error: {str(e)}")
 
         # Statistics Section with Professional Cards
         if st.session_state.rag_system and st.session_state.rag_system.vector_store:
@@ -989,52 +1409,14 @@ def main():
                 </div>
             """, unsafe_allow_html=True)
 
-            # Documents Loaded Card
+            # Native metrics; card styling lives in the static stylesheet above
             doc_count = len(uploaded_files) if uploaded_files else 0
-            st.markdown(f"""
-                <div style="background: white;
-                            padding: 15px;
-                            border-radius: 8px;
-                            margin: 10px 0;
-                            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-                            border-left: 3px solid #667eea;">
-                    <p style="color: #666; margin: 0; font-size: 12px; font-weight: 600; text-transform: uppercase;">Documents Loaded</p>
-                    <h2 style="color: #667eea; margin: 5px 0 0 0; font-size: 32px; font-weight: 700;">{doc_count}</h2>
-                </div>
-            """, unsafe_allow_html=True)
+            st.metric("Documents Loaded", doc_count)
 
-            # Total Chunks Card
-            try:
-                chunk_count = st.session_state.rag_system.vector_store._collection.count()
-            except Exception as e:
-                logger.error(f"Error getting chunk count: {str(e)}")
-                chunk_count = "N/A"
+            # Counted at ingest, not queried on every rerun
+            st.metric("Total Chunks", st.session_state.rag_system.chunk_count)
 
-            st.markdown(f"""
-                <div style="background: white;
-                            padding: 15px;
-                            border-radius: 8px;
-                            margin: 10px 0;
-                            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-                            border-left: 3px solid #764ba2;">
-                    <p style="color: #666; margin: 0; font-size: 12px; font-weight: 600; text-transform: uppercase;">Total Chunks</p>
-                    <h2 style="color: #764ba2; margin: 5px 0 0 0; font-size: 32px; font-weight: 700;">{chunk_count}</h2>
-                </div>
-            """, unsafe_allow_html=True)
-
-            # Messages Card
-            msg_count = len(st.session_state.chat_history)
-            st.markdown(f"""
-                <div style="background: white;
-                            padding: 15px;
-                            border-radius: 8px;
-                            margin: 10px 0;
-                            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-                            border-left: 3px solid #FF6B6B;">
-                    <p style="color: #666; margin: 0; font-size: 12px; font-weight: 600; text-transform: uppercase;">Messages</p>
-                    <h2 style="color: #FF6B6B; margin: 5px 0 0 0; font-size: 32px; font-weight: 700;">{msg_count}</h2>
-                </div>
-            """, unsafe_allow_html=True)
+            st.metric("Messages", len(st.session_state.chat_history))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -28,6 +28,10 @@ if not exist ".env" (
     exit /b 1
 )
 
+REM Precompile modules so worker starts skip parsing the large prompt literals
+echo [INFO] Precompiling Python modules...
+python -m compileall -q -l .
+
 REM Run the application
 echo [INFO] Starting Streamlit application...
 echo.
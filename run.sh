@@ -26,6 +26,10 @@ if [ ! -f ".env" ]; then
     exit 1
 fi
 
+# Precompile modules so worker starts skip parsing the large prompt literals
+echo "[INFO] Precompiling Python modules..."
+python -m compileall -q -l .
+
 # Run the application
 echo "[INFO] Starting Streamlit application..."
 echo ""
@@ -0,0 +1,66 @@
+"""
+Semantic cache for retrieval results keyed on query embeddings
+"""
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """Return a cached result when a new query embedding is close enough to a cached one
+
+    Embeddings are expected to be unit-normalized, so cosine similarity is a
+    single matrix-vector product. When full, the least frequently hit entry is evicted.
+    Safe to share between threads (graph nodes run concurrently under "Run all").
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # Keeps _vectors rows and _results / _hits entries in step
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every cached entry (e.g. after new documents are indexed)"""
+        with self._lock:
+            self._vectors: Optional[np.ndarray] = None  # [n, dim] float32
+            self._results: List[str] = []
+            self._hits: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def lookup(self, vector) -> Optional[str]:
+        """Return the cached result for the most similar query above the threshold, else None"""
+        with self._lock:
+            if self._vectors is None:
+                return None
+            # Imported on first use: utils_fast pulls in numba
+            from utils_fast import topk_cosine
+            idx, sims = topk_cosine(self._vectors, vector, 1)
+            if sims[0] < self.threshold:
+                return None
+            best = int(idx[0])
+            self._hits[best] += 1
+            return self._results[best]
+
+    def add(self, vector, result: str) -> None:
+        """Cache a result under its query embedding, evicting the least used entry when full"""
+        if self.max_entries <= 0:
+            return
+        row = np.asarray(vector, dtype=np.float32)[None, :]
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = row
+            else:
+                if len(self._results) >= self.max_entries:
+                    victim = int(np.argmin(self._hits))
+                    self._vectors = np.delete(self._vectors, victim, axis=0)
+                    del self._results[victim]
+                    del self._hits[victim]
+                self._vectors = np.vstack([self._vectors, row])
+            self._results.append(result)
+            self._hits.append(0)
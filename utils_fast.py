@@ -0,0 +1,67 @@
+"""
+Compiled kernels for hot vector-search paths
+Uses numba when installed and falls back to NumPy otherwise
+"""
+
+import logging
+import threading
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # Optional dependency
+    HAVE_NUMBA = False
+
+# numba's default (workqueue) threading layer is not thread-safe, so concurrent
+# callers (e.g. graph nodes under "Run all") take turns entering the kernel
+_KERNEL_LOCK = threading.Lock()
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cosine_scores(mat, q):
+        """Dot product of every row with q (rows split across threads)"""
+        n, dim = mat.shape
+        scores = np.empty(n, np.float32)
+        for i in prange(n):
+            s = np.float32(0.0)
+            for d in range(dim):
+                s += mat[i, d] * q[d]
+            scores[i] = s
+        return scores
+else:
+    def _cosine_scores(mat, q):
+        """Dot product of every row with q (BLAS GEMV)"""
+        return mat @ q
+
+
+def topk_cosine(mat: np.ndarray, q: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (indices, scores) of the k rows of mat most similar to q, best first
+
+    Rows and q are expected to be unit-normalized float32 vectors.
+    """
+    mat = np.ascontiguousarray(mat, dtype=np.float32)
+    q = np.ascontiguousarray(q, dtype=np.float32)
+    with _KERNEL_LOCK:
+        scores = _cosine_scores(mat, q)
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, np.int64), np.empty(0, np.float32)
+    # Partial selection, then order only the k winners
+    idx = np.argpartition(-scores, k - 1)[:k]
+    idx = idx[np.argsort(-scores[idx])]
+    return idx, scores[idx]
+
+
+def prewarm() -> None:
+    """Compile the kernel ahead of the first query (no-op without numba)
+
+    Not run at import: callers trigger it off the page-render path.
+    """
+    if HAVE_NUMBA:
+        topk_cosine(np.zeros((1, 384), np.float32), np.zeros(384, np.float32), 1)